@@ -3,13 +3,16 @@
 
 import os
 import re
-import defusedxml.ElementTree as ET
+from lxml import etree as ET
+from pathlib import Path
 from string import Template
 
 STORE = "target/gh-pages-store"
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+_VER_SPLIT = re.compile(r'[.\-]')
+
 LATEST_SECTION = """\
   <div class="card">
     <h2>Latest Release</h2>
@@ -32,33 +35,48 @@ ALL_RELEASES_SECTION = """\
     </ul>
   </div>"""
 
-RELEASE_ITEM = '      <li><a href="{v}/">v{v}</a></li>'
-
 
 def version_key(v):
     return tuple(
         (0, int(x)) if x.isdigit() else (1, x)
-        for x in re.split(r'[.\-]', v)
+        for x in _VER_SPLIT.split(v)
     )
 
 
-def read_pom_field(tag, pom_path='pom.xml'):
-    ns = {'m': 'http://maven.apache.org/POM/4.0.0'}
-    root = ET.parse(pom_path).getroot()
-    el = root.find(f'm:{tag}', ns)
-    return el.text.strip() if el is not None else ''
+def read_pom_fields(tags, pom_path='pom.xml'):
+    """Stream pom.xml and return the text of the given top-level <project> fields.
+    Parsing stops as soon as all of them have been seen."""
+    ns = 'http://maven.apache.org/POM/4.0.0'
+    wanted = {f'{{{ns}}}{tag}': tag for tag in tags}
+    fields = dict.fromkeys(tags, '')
+    remaining = len(wanted)
+    for _, el in ET.iterparse(
+        pom_path, events=('end',), tag=tuple(wanted),
+        resolve_entities=False, no_network=True,
+    ):
+        # Unresolved entities would silently blank out a field, so refuse any DTD
+        if el.getroottree().docinfo.doctype:
+            raise ValueError(f'{pom_path}: DOCTYPE declarations are not allowed')
+        if el.getparent().getparent() is None:
+            fields[wanted[el.tag]] = (el.text or '').strip()
+            remaining -= 1
+            if not remaining:
+                break
+        el.clear()
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+    return fields
 
 
 def read_stored_version(directory):
     try:
-        with open(os.path.join(STORE, directory, '.version')) as f:
-            return f.read().strip()
+        return (Path(STORE) / directory / '.version').read_text().strip()
     except OSError:
         return None
 
 
 versions = sorted(
-    [e.name for e in os.scandir(STORE) if e.is_dir() and re.match(r'^\d', e.name)],
+    (e.name for e in os.scandir(STORE) if e.is_dir() and e.name[:1].isdigit()),
     key=version_key,
     reverse=True,
 )
@@ -74,19 +92,19 @@ if os.path.isdir(os.path.join(STORE, 'snapshot')):
     sections.append(SNAPSHOT_SECTION.format(version=snapshot_version))
 
 if versions:
-    items = '\n'.join(RELEASE_ITEM.format(v=v) for v in versions)
+    items = '\n'.join(f'      <li><a href="{v}/">v{v}</a></li>' for v in versions)
     sections.append(ALL_RELEASES_SECTION.format(items=items))
 
 with open(os.path.join(SCRIPT_DIR, 'site-index-template.html')) as f:
     template = Template(f.read())
 
-html = template.substitute(
-    name=read_pom_field('name'),
-    description=read_pom_field('description'),
-    sections='\n'.join(sections),
-)
+pom_fields = read_pom_fields(('name', 'description'))
 
 with open(os.path.join(STORE, 'index.html'), 'w') as f:
-    f.write(html)
+    f.write(template.substitute(
+        name=pom_fields['name'],
+        description=pom_fields['description'],
+        sections='\n'.join(sections),
+    ))
 
 print("Generated index.html with %d release(s)" % len(versions))